@@ -8,7 +8,8 @@ import uuid
 from dotenv import load_dotenv
 import os
 import secrets
-from datetime import datetime, timedelta
+import time
+from contextlib import asynccontextmanager
 import numpy as np
 
 # =========================================
@@ -36,11 +37,39 @@ API_KEY = os.getenv("API_KEY")
 if not API_KEY:
     raise RuntimeError("API_KEY não configurada no ambiente")
 
+# "sqlite" compartilha tokens entre workers do uvicorn; "memoria" só serve para um
+TOKEN_STORE = os.getenv("TOKEN_STORE", "sqlite")
+TOKEN_DB_PATH = os.getenv("TOKEN_DB_PATH", str(BASE_DIR / "tokens.db"))
+TOKEN_TTL_MINUTES = 10
+TOKEN_SWEEP_SECONDS = 60
+
 # =========================================
 # IMPORT DO MOTOR
 # =========================================
 
 from motor import executar_conciliacao_empresa
+from validacao import PlanilhaInvalida, validar_lancamentos, validar_plano_contas
+from tokens import VarredorTokens, criar_token_store
+
+# =========================================
+# TOKENS
+# =========================================
+
+@asynccontextmanager
+async def lifespan(app):
+    # Criado aqui, já no processo do worker: conexão SQLite não pode
+    # ser herdada de um processo pai (ex.: gunicorn --preload)
+    tokens_store = criar_token_store(TOKEN_STORE, TOKEN_DB_PATH)
+    varredor_tokens = VarredorTokens(tokens_store, TOKEN_SWEEP_SECONDS)
+    app.state.tokens_store = tokens_store
+
+    varredor_tokens.iniciar()
+    try:
+        yield
+    finally:
+        varredor_tokens.parar()
+        tokens_store.fechar()
+        app.state.tokens_store = None
 
 # =========================================
 # FASTAPI
@@ -48,7 +77,8 @@ from motor import executar_conciliacao_empresa
 
 app = FastAPI(
     title="API Conciliação Contábil - MVP",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan
 )
 
 # =========================================
@@ -79,21 +109,47 @@ app.add_middleware(
 
 security = HTTPBearer()
 
-# Tokens temporários (MVP)
-TOKENS_TEMP = {}
+def obter_tokens_store(request: Request):
+    # Só existe depois do lifespan; sem ele a API não tem onde guardar tokens
+    tokens_store = getattr(request.app.state, "tokens_store", None)
+
+    if tokens_store is None:
+        raise HTTPException(status_code=503, detail="Armazenamento de tokens indisponível")
+
+    return tokens_store
 
 def validar_token(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
+    tokens_store = obter_tokens_store(request)
     token = credentials.credentials
+    expira_em = tokens_store.expira_em(token)
 
-    if token not in TOKENS_TEMP:
+    if expira_em is None:
         raise HTTPException(status_code=403, detail="Token inválido")
 
-    if TOKENS_TEMP[token] < datetime.utcnow():
-        del TOKENS_TEMP[token]
+    if expira_em < time.time():
+        tokens_store.remover(token)
         raise HTTPException(status_code=403, detail="Token expirado")
 
+# =========================================
+# VALIDAÇÃO DE UPLOAD
+# =========================================
+
+def validar_upload(file: UploadFile, validador):
+    """
+    Valida cabeçalho e primeiras linhas antes de gravar/processar.
+    Falha rápido com 422 em vez de estourar no meio do motor.
+    """
+    try:
+        dimensoes = validador(file.file)
+    except PlanilhaInvalida as e:
+        raise HTTPException(status_code=422, detail=e.detalhe)
+
+    file.file.seek(0)
+    return dimensoes
+
 # =========================================
 # ENDPOINT DE INICIALIZAÇÃO
 # =========================================
@@ -122,11 +178,11 @@ def gerar_token(request: Request):
         raise HTTPException(status_code=403, detail="Origem não autorizada")
 
     token = secrets.token_urlsafe(32)
-    TOKENS_TEMP[token] = datetime.utcnow() + timedelta(minutes=10)
+    obter_tokens_store(request).adicionar(token, TOKEN_TTL_MINUTES * 60)
 
     return {
         "token": token,
-        "expires_in_minutes": 10
+        "expires_in_minutes": TOKEN_TTL_MINUTES
     }
 
 # =========================================
@@ -156,21 +212,24 @@ def upload_plano_contas(
         raise HTTPException(status_code=400, detail="Arquivo deve ser .xlsx")
 
     empresa_dir = EMPRESAS_DIR / empresa_id
-    empresa_dir.mkdir(parents=True, exist_ok=True)
-
     plano_path = empresa_dir / "plano_contas.xlsx"
     mapa_path = empresa_dir / "mapa_plano.json"
 
     if mapa_path.exists():
         raise HTTPException(status_code=409, detail="Plano já mapeado")
 
+    dimensoes = validar_upload(file, validar_plano_contas)
+
+    empresa_dir.mkdir(parents=True, exist_ok=True)
+
     with open(plano_path, "wb") as buffer:
         shutil.copyfileobj(file.file, buffer)
 
     return {
         "status": "ok",
         "message": "Plano de contas enviado com sucesso",
-        "empresa_id": empresa_id
+        "empresa_id": empresa_id,
+        "planilha": dimensoes
     }
 
 @app.put(
@@ -185,6 +244,8 @@ def atualizar_plano_contas(
     if not empresa_dir.exists():
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
 
+    dimensoes = validar_upload(file, validar_plano_contas)
+
     plano_path = empresa_dir / "plano_contas.xlsx"
     mapa_path = empresa_dir / "mapa_plano.json"
 
@@ -196,7 +257,8 @@ def atualizar_plano_contas(
 
     return {
         "status": "ok",
-        "message": "Plano de contas atualizado"
+        "message": "Plano de contas atualizado",
+        "planilha": dimensoes
     }
 
 # =========================================
@@ -218,6 +280,8 @@ def conciliar(
     if not plano_path.exists():
         raise HTTPException(status_code=409, detail="Plano não encontrado")
 
+    dimensoes = validar_upload(file, validar_lancamentos)
+
     exec_id = str(uuid.uuid4())
     upload_path = UPLOAD_DIR / f"{empresa_id}_{exec_id}.xlsx"
 
@@ -254,6 +318,7 @@ def conciliar(
 
         return {
             "resumo": resumo_json,
+            "planilha": dimensoes,
             "dados": df_json.to_dict(orient="records")
         }
 
@@ -0,0 +1,43 @@
+import importlib
+from io import BytesIO
+
+import openpyxl
+import pytest
+
+CABECALHO_LANCAMENTOS = ["Data", "Conta Débito", "Conta Crédito", "Valor", "Descrição Histórico"]
+CABECALHO_PLANO = ["Conta", "Descrição", "Grupo Conta", "Analítica", "Código Reduzido"]
+
+
+def planilha_xlsx(linhas):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for linha in linhas:
+        ws.append(linha)
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    # app.py cria os diretórios relativos ao cwd e exige API_KEY no import
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("API_KEY", "teste")
+    modulo = importlib.import_module("app")
+    monkeypatch.setattr(modulo, "TOKEN_STORE", "memoria")
+    return modulo
+
+
+@pytest.fixture
+def client(app_module):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_module.app) as c:
+        yield c
+
+
+@pytest.fixture
+def token(client):
+    resp = client.get("/auth/token", headers={"origin": "http://localhost:8080"})
+    return resp.json()["token"]
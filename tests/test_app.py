@@ -0,0 +1,123 @@
+from io import BytesIO
+
+from conftest import CABECALHO_PLANO, planilha_xlsx
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _enviar_plano(client, token, arquivo, empresa_id="123"):
+    return client.post(
+        f"/empresas/{empresa_id}/plano-contas",
+        headers={"Authorization": f"Bearer {token}"},
+        files={"file": ("plano.xlsx", arquivo, XLSX)},
+    )
+
+
+def test_upload_plano_valido(client, token, app_module):
+    arquivo = planilha_xlsx([
+        CABECALHO_PLANO,
+        ["1", "ATIVO", 1, False, 1],
+        ["101", "CAIXA", 1, True, 2],
+    ])
+    conteudo = arquivo.getvalue()
+
+    resp = _enviar_plano(client, token, arquivo)
+
+    assert resp.status_code == 200
+    assert resp.json()["planilha"] == {"aba": "Sheet", "linhas": 2, "colunas": 5}
+    # validar_upload precisa rebobinar o arquivo antes da gravação
+    gravado = app_module.EMPRESAS_DIR / "123" / "plano_contas.xlsx"
+    assert gravado.read_bytes() == conteudo
+
+
+def test_upload_plano_invalido_retorna_422(client, token, app_module):
+    arquivo = planilha_xlsx([["Conta", "Descrição"], ["1", "ATIVO"]])
+
+    resp = _enviar_plano(client, token, arquivo)
+
+    assert resp.status_code == 422
+    assert resp.json()["detail"] == {
+        "erro": "Colunas obrigatórias ausentes",
+        "aba": "Sheet",
+        "colunas_faltando": ["Grupo Conta", "Analítica", "Código Reduzido"],
+    }
+    assert not (app_module.EMPRESAS_DIR / "123").exists()
+
+
+def test_upload_plano_ja_mapeado_retorna_409_sem_validar(client, token, app_module):
+    empresa_dir = app_module.EMPRESAS_DIR / "123"
+    empresa_dir.mkdir(parents=True)
+    (empresa_dir / "mapa_plano.json").write_text("{}")
+
+    resp = _enviar_plano(client, token, BytesIO(b"nao e xlsx"))
+
+    assert resp.status_code == 409
+
+
+def test_token_emitido_e_aceito(client, token):
+    # Empresa inexistente: passar da autenticação resulta em 404
+    resp = client.put(
+        "/empresas/999/plano-contas",
+        headers={"Authorization": f"Bearer {token}"},
+        files={"file": ("plano.xlsx", b"", XLSX)},
+    )
+
+    assert resp.status_code == 404
+
+
+def test_token_de_origem_nao_autorizada(client):
+    resp = client.get("/auth/token", headers={"origin": "https://exemplo.com"})
+
+    assert resp.status_code == 403
+
+
+def test_token_desconhecido(client):
+    resp = client.put(
+        "/empresas/999/plano-contas",
+        headers={"Authorization": "Bearer desconhecido"},
+        files={"file": ("plano.xlsx", b"", XLSX)},
+    )
+
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == "Token inválido"
+
+
+def test_token_expirado(client, app_module):
+    store = app_module.app.state.tokens_store
+    store.adicionar("velho", -1)
+
+    resp = client.put(
+        "/empresas/999/plano-contas",
+        headers={"Authorization": "Bearer velho"},
+        files={"file": ("plano.xlsx", b"", XLSX)},
+    )
+
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == "Token expirado"
+    assert store.expira_em("velho") is None
+
+
+def test_token_sqlite_criado_no_lifespan(app_module, monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(app_module, "TOKEN_STORE", "sqlite")
+    monkeypatch.setattr(app_module, "TOKEN_DB_PATH", str(tmp_path / "tokens.db"))
+
+    with TestClient(app_module.app) as c:
+        resp = c.get("/auth/token", headers={"origin": "http://localhost:8080"})
+        token = resp.json()["token"]
+        assert app_module.app.state.tokens_store.expira_em(token) is not None
+
+    assert (tmp_path / "tokens.db").exists()
+    assert app_module.app.state.tokens_store is None
+
+
+def test_sem_lifespan_retorna_503(app_module):
+    from fastapi.testclient import TestClient
+
+    # TestClient fora do "with" não executa o lifespan
+    c = TestClient(app_module.app)
+
+    resp = c.get("/auth/token", headers={"origin": "http://localhost:8080"})
+
+    assert resp.status_code == 503
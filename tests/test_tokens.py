@@ -0,0 +1,108 @@
+import multiprocessing
+import sqlite3
+import time
+
+import pytest
+
+from tokens import TokenStore, TokenStoreMemoria, TokenStoreSQLite, VarredorTokens
+
+
+def test_token_store_incompleto_falha_na_criacao():
+    class SemVarrer(TokenStore):
+        def adicionar(self, token, ttl_segundos): ...
+        def expira_em(self, token): ...
+        def remover(self, token): ...
+
+    with pytest.raises(TypeError):
+        SemVarrer()
+
+
+def test_memoria_expira_e_varre():
+    store = TokenStoreMemoria()
+    store.adicionar("curto", 0.01)
+    store.adicionar("longo", 60)
+
+    assert store.expira_em("curto") is not None
+    assert store.expira_em("inexistente") is None
+
+    time.sleep(0.02)
+
+    assert store.varrer() == 1
+    assert store.expira_em("curto") is None
+    assert store.expira_em("longo") is not None
+
+
+def test_memoria_varrer_ignora_token_regravado():
+    store = TokenStoreMemoria()
+    store.adicionar("t", 0.01)
+    store.adicionar("t", 60)
+
+    time.sleep(0.02)
+
+    assert store.varrer() == 0
+    assert store.expira_em("t") is not None
+
+
+def test_sqlite_expira_e_varre(tmp_path):
+    store = TokenStoreSQLite(tmp_path / "tokens.db")
+    store.adicionar("curto", 0.01)
+    store.adicionar("longo", 60)
+
+    time.sleep(0.02)
+
+    assert store.varrer() == 1
+    assert store.expira_em("curto") is None
+    assert store.expira_em("longo") is not None
+    store.fechar()
+
+
+def _worker_sqlite(path, indice, barreira):
+    barreira.wait()
+    store = TokenStoreSQLite(path)
+    for i in range(20):
+        store.adicionar(f"w{indice}-{i}", 60)
+    store.fechar()
+
+
+def test_sqlite_compartilhado_entre_processos(tmp_path):
+    path = tmp_path / "tokens.db"
+    # Workers do uvicorn sobem juntos: todos criam o banco (WAL, tabela,
+    # índice) ao mesmo tempo sobre um arquivo novo
+    ctx = multiprocessing.get_context("spawn")
+    barreira = ctx.Barrier(4)
+    processos = [
+        ctx.Process(target=_worker_sqlite, args=(path, n, barreira))
+        for n in range(4)
+    ]
+    for p in processos:
+        p.start()
+    for p in processos:
+        p.join(timeout=30)
+        assert p.exitcode == 0
+
+    store = TokenStoreSQLite(path)
+    assert all(
+        store.expira_em(f"w{n}-{i}") is not None
+        for n in range(4)
+        for i in range(20)
+    )
+    store.fechar()
+
+
+def test_varredor_sobrevive_a_erro_do_banco():
+    class StoreInstavel(TokenStoreMemoria):
+        chamadas = 0
+
+        def varrer(self):
+            self.chamadas += 1
+            if self.chamadas == 1:
+                raise sqlite3.DatabaseError("disk I/O error")
+            return super().varrer()
+
+    store = StoreInstavel()
+    varredor = VarredorTokens(store, intervalo_segundos=0.01)
+    varredor.iniciar()
+    time.sleep(0.1)
+    varredor.parar()
+
+    assert store.chamadas > 1
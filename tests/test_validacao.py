@@ -0,0 +1,148 @@
+import zipfile
+from datetime import datetime
+from io import BytesIO
+
+import pytest
+
+from conftest import CABECALHO_LANCAMENTOS, CABECALHO_PLANO, planilha_xlsx as _planilha
+from validacao import PlanilhaInvalida, validar_lancamentos, validar_plano_contas
+
+
+def test_lancamentos_validos_retorna_dimensoes():
+    arquivo = _planilha([
+        CABECALHO_LANCAMENTOS,
+        [datetime(2025, 1, 2), "1 - CAIXA", "2 - CLIENTE A", 100.0, "NF 1"],
+        ["2025-01-03", "1 - CAIXA", "2 - CLIENTE B", 50.0, "NF 2"],
+    ])
+
+    dimensoes = validar_lancamentos(arquivo)
+
+    assert dimensoes["linhas"] == 2
+    assert dimensoes["colunas"] == 5
+
+
+def test_colunas_ausentes():
+    arquivo = _planilha([["Data", "Valor"], [datetime(2025, 1, 2), 10.0]])
+
+    with pytest.raises(PlanilhaInvalida) as exc:
+        validar_lancamentos(arquivo)
+
+    assert exc.value.detalhe["colunas_faltando"] == [
+        "Conta Débito", "Conta Crédito", "Descrição Histórico"
+    ]
+
+
+def test_cabecalho_com_espaco_nao_passa():
+    cabecalho = ["Data ", " Conta Débito", "Conta Crédito", "Valor", "Descrição Histórico"]
+    arquivo = _planilha([cabecalho, [datetime(2025, 1, 2), "1 - CAIXA", "2 - X", 1.0, "h"]])
+
+    with pytest.raises(PlanilhaInvalida) as exc:
+        validar_lancamentos(arquivo)
+
+    assert exc.value.detalhe["colunas_faltando"] == ["Data", "Conta Débito"]
+
+
+def test_data_invalida():
+    arquivo = _planilha([
+        CABECALHO_LANCAMENTOS,
+        ["não é data", "1 - CAIXA", "2 - X", 1.0, "h"],
+    ])
+
+    with pytest.raises(PlanilhaInvalida) as exc:
+        validar_lancamentos(arquivo)
+
+    assert exc.value.detalhe["coluna"] == "Data"
+
+
+def test_datas_com_formatos_misturados():
+    arquivo = _planilha([
+        CABECALHO_LANCAMENTOS,
+        ["2025-02-01", "1 - CAIXA", "2 - X", 1.0, "h"],
+        ["01/03/2025", "1 - CAIXA", "2 - X", 1.0, "h"],
+    ])
+
+    with pytest.raises(PlanilhaInvalida):
+        validar_lancamentos(arquivo)
+
+
+def test_arquivo_que_nao_e_xlsx():
+    with pytest.raises(PlanilhaInvalida):
+        validar_lancamentos(BytesIO(b"Data;Valor\n"))
+
+
+def test_plano_com_tipo_errado():
+    arquivo = _planilha([
+        CABECALHO_PLANO,
+        ["1", "ATIVO", "1", False, 1],
+    ])
+
+    with pytest.raises(PlanilhaInvalida) as exc:
+        validar_plano_contas(arquivo)
+
+    assert exc.value.detalhe["coluna"] == "Grupo Conta"
+    assert exc.value.detalhe["linha"] == 2
+
+
+def test_plano_valido():
+    arquivo = _planilha([
+        CABECALHO_PLANO,
+        ["1", "ATIVO", 1, False, 1],
+        ["101", "CAIXA", 1, True, 2],
+    ])
+
+    assert validar_plano_contas(arquivo)["linhas"] == 2
+
+
+def test_valor_em_texto():
+    arquivo = _planilha([
+        CABECALHO_LANCAMENTOS,
+        [datetime(2025, 1, 2), "1 - CAIXA", "2 - X", "cem reais", "h"],
+    ])
+
+    with pytest.raises(PlanilhaInvalida) as exc:
+        validar_lancamentos(arquivo)
+
+    assert exc.value.detalhe["coluna"] == "Valor"
+
+
+def test_conta_numerica():
+    arquivo = _planilha([
+        CABECALHO_LANCAMENTOS,
+        [datetime(2025, 1, 2), 101, "2 - X", 1.0, "h"],
+    ])
+
+    with pytest.raises(PlanilhaInvalida) as exc:
+        validar_lancamentos(arquivo)
+
+    assert exc.value.detalhe["coluna"] == "Conta Débito"
+
+
+def test_plano_com_descricao_em_branco():
+    arquivo = _planilha([
+        CABECALHO_PLANO,
+        ["1", "ATIVO", 1, False, 1],
+        ["101", None, 1, True, 2],
+    ])
+
+    assert validar_plano_contas(arquivo)["linhas"] == 2
+
+
+def test_xml_da_aba_truncado():
+    original = _planilha([
+        CABECALHO_LANCAMENTOS,
+        [datetime(2025, 1, 2), "1 - CAIXA", "2 - X", 1.0, "h"],
+    ])
+
+    truncado = BytesIO()
+    with zipfile.ZipFile(original) as zin, zipfile.ZipFile(truncado, "w") as zout:
+        for item in zin.infolist():
+            dados = zin.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                dados = dados[: len(dados) // 2]
+            zout.writestr(item, dados)
+    truncado.seek(0)
+
+    with pytest.raises(PlanilhaInvalida) as exc:
+        validar_lancamentos(truncado)
+
+    assert exc.value.detalhe["erro"] == "Arquivo não é uma planilha .xlsx válida"
@@ -0,0 +1,183 @@
+import heapq
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+
+class TokenStore(ABC):
+    """
+    Armazenamento de tokens temporários com expiração.
+    Implementações devem ser seguras para uso entre threads.
+    """
+
+    @abstractmethod
+    def adicionar(self, token: str, ttl_segundos: float):
+        ...
+
+    @abstractmethod
+    def expira_em(self, token: str) -> float | None:
+        """Retorna o timestamp de expiração, ou None se o token não existe."""
+
+    @abstractmethod
+    def remover(self, token: str):
+        ...
+
+    @abstractmethod
+    def varrer(self) -> int:
+        """Remove tokens expirados e retorna quantos foram removidos."""
+
+    def fechar(self):
+        pass
+
+# =====================================================
+# MEMÓRIA (PROCESSO ÚNICO)
+# =====================================================
+
+class TokenStoreMemoria(TokenStore):
+    """
+    Dict para validação O(1) + heap de expiração para varredura
+    O(log n) por token removido. Só vale para um worker.
+    """
+
+    def __init__(self):
+        self._tokens = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def adicionar(self, token: str, ttl_segundos: float):
+        expira = time.time() + ttl_segundos
+        with self._lock:
+            self._tokens[token] = expira
+            heapq.heappush(self._heap, (expira, token))
+
+    def expira_em(self, token: str) -> float | None:
+        return self._tokens.get(token)
+
+    def remover(self, token: str):
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def varrer(self) -> int:
+        agora = time.time()
+        removidos = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= agora:
+                expira, token = heapq.heappop(self._heap)
+                # Entrada antiga no heap de um token removido ou regravado
+                if self._tokens.get(token) == expira:
+                    del self._tokens[token]
+                    removidos += 1
+        return removidos
+
+# =====================================================
+# SQLITE (MULTI-WORKER)
+# =====================================================
+
+class TokenStoreSQLite(TokenStore):
+    """
+    Tokens em um arquivo SQLite compartilhado entre os workers.
+    Validação pela chave primária e varredura pelo índice de
+    expiração, ambos O(log n).
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path,
+            timeout=5,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            " token TEXT PRIMARY KEY,"
+            " expira_em REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tokens_expira_em ON tokens (expira_em)"
+        )
+
+    def adicionar(self, token: str, ttl_segundos: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tokens (token, expira_em) VALUES (?, ?)",
+                (token, time.time() + ttl_segundos),
+            )
+
+    def expira_em(self, token: str) -> float | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expira_em FROM tokens WHERE token = ?", (token,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def remover(self, token: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM tokens WHERE token = ?", (token,))
+
+    def varrer(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM tokens WHERE expira_em <= ?", (time.time(),)
+            )
+        return cur.rowcount
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+# =====================================================
+# VARREDURA EM BACKGROUND
+# =====================================================
+
+class VarredorTokens:
+    """
+    Thread daemon que chama `store.varrer()` periodicamente.
+    Com SQLite, cada worker roda o seu; o DELETE é idempotente.
+    """
+
+    def __init__(self, store: TokenStore, intervalo_segundos: float = 60):
+        self.store = store
+        self.intervalo_segundos = intervalo_segundos
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _loop(self):
+        while not self._parar.wait(self.intervalo_segundos):
+            try:
+                self.store.varrer()
+            except sqlite3.Error:
+                # Banco ocupado/indisponível; a thread não pode morrer, tenta no próximo ciclo
+                continue
+
+    def iniciar(self):
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="varredor-tokens", daemon=True
+        )
+        self._thread.start()
+
+    def parar(self):
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
+
+
+def criar_token_store(backend: str, sqlite_path: str | Path) -> TokenStore:
+    if backend == "memoria":
+        return TokenStoreMemoria()
+    if backend == "sqlite":
+        return TokenStoreSQLite(sqlite_path)
+    raise ValueError(f"TOKEN_STORE inválido: '{backend}'")
@@ -0,0 +1,203 @@
+import zlib
+from xml.etree.ElementTree import ParseError
+from zipfile import BadZipFile
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+# =====================================================
+# ESQUEMAS ESPERADOS
+# =====================================================
+
+COLUNAS_LANCAMENTOS = [
+    "Data",
+    "Conta Débito",
+    "Conta Crédito",
+    "Valor",
+    "Descrição Histórico",
+]
+
+COLUNAS_PLANO = [
+    "Conta",
+    "Descrição",
+    "Grupo Conta",
+    "Analítica",
+    "Código Reduzido",
+]
+
+# Quantidade de linhas de dados inspecionadas além do cabeçalho
+LINHAS_AMOSTRA = 50
+
+
+class PlanilhaInvalida(Exception):
+    """
+    Planilha rejeitada antes do parse completo.
+    `detalhe` é serializável e vai direto no corpo do 422.
+    """
+
+    def __init__(self, mensagem: str, **extras):
+        super().__init__(mensagem)
+        self.detalhe = {"erro": mensagem, **extras}
+
+# =====================================================
+# LEITURA PARCIAL
+# =====================================================
+
+def _abrir_primeira_aba(arquivo):
+    """
+    Abre o workbook em modo streaming (read_only) e retorna a
+    primeira aba, que é a mesma lida pelo pd.read_excel.
+    """
+    try:
+        wb = load_workbook(arquivo, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException, KeyError, OSError, ValueError):
+        raise PlanilhaInvalida("Arquivo não é uma planilha .xlsx válida")
+
+    if not wb.worksheets:
+        wb.close()
+        raise PlanilhaInvalida("Planilha sem abas")
+
+    return wb, wb.worksheets[0]
+
+
+def _ler_amostra(ws):
+    # Em read_only o xml da aba só é lido aqui, não no load_workbook
+    try:
+        return list(ws.iter_rows(max_row=LINHAS_AMOSTRA + 1, values_only=True))
+    except (ParseError, BadZipFile, EOFError, KeyError, zlib.error):
+        raise PlanilhaInvalida("Arquivo não é uma planilha .xlsx válida")
+
+
+def _dimensoes(ws):
+    # Vem da tag <dimension> do xml; pode faltar em arquivos gerados por terceiros
+    try:
+        ws.calculate_dimension()
+    except ValueError:
+        return {"aba": ws.title, "linhas": None, "colunas": None}
+
+    return {
+        "aba": ws.title,
+        "linhas": max((ws.max_row or 1) - 1, 0),
+        "colunas": ws.max_column,
+    }
+
+
+def _eh_numero(valor):
+    return valor is None or (
+        isinstance(valor, (int, float)) and not isinstance(valor, bool)
+    )
+
+
+def _eh_booleano(valor):
+    return valor is None or isinstance(valor, bool)
+
+
+def _eh_texto(valor):
+    return valor is None or isinstance(valor, str)
+
+
+def _conferir_datas(valores, coluna, aba):
+    # Mesma chamada do motor (filtrar_periodo): a coluna inteira de uma vez,
+    # para que o formato inferido do primeiro valor valha para os demais
+    try:
+        pd.to_datetime(pd.Series(valores, dtype=object))
+    except (ValueError, TypeError) as e:
+        raise PlanilhaInvalida(
+            "Valor inválido para coluna de data",
+            aba=aba,
+            coluna=coluna,
+            motivo=str(e),
+        )
+
+# =====================================================
+# VALIDAÇÃO
+# =====================================================
+
+def validar_planilha(arquivo, colunas, colunas_data=(), tipos=None):
+    """
+    Lê apenas o cabeçalho e as primeiras linhas da planilha,
+    confere as colunas obrigatórias, as colunas de data e os tipos
+    pedidos em `tipos` ({coluna: (checagem, nome do tipo)}).
+    Retorna as dimensões da aba para dimensionar o processamento.
+    """
+    tipos = tipos or {}
+    wb, ws = _abrir_primeira_aba(arquivo)
+
+    try:
+        amostra = _ler_amostra(ws)
+
+        if not amostra:
+            raise PlanilhaInvalida("Planilha vazia", aba=ws.title)
+
+        cabecalho, linhas = amostra[0], amostra[1:]
+
+        # Sem strip: o pd.read_excel do motor mantém o cabeçalho como está
+        nomes = [str(c) if c is not None else None for c in cabecalho]
+        faltando = [c for c in colunas if c not in nomes]
+
+        if faltando:
+            raise PlanilhaInvalida(
+                "Colunas obrigatórias ausentes",
+                aba=ws.title,
+                colunas_faltando=faltando,
+            )
+
+        indices_data = {c: nomes.index(c) for c in colunas_data}
+        indices_tipos = {c: nomes.index(c) for c in tipos}
+        datas = {c: [] for c in colunas_data}
+
+        for num_linha, linha in enumerate(linhas, start=2):
+            if all(v is None for v in linha):
+                continue
+
+            linha = list(linha) + [None] * (len(nomes) - len(linha))
+
+            for coluna, idx in indices_data.items():
+                if linha[idx] is not None:
+                    datas[coluna].append(linha[idx])
+
+            for coluna, idx in indices_tipos.items():
+                checagem, nome_tipo = tipos[coluna]
+                if not checagem(linha[idx]):
+                    raise PlanilhaInvalida(
+                        f"Valor inválido para coluna {nome_tipo}",
+                        aba=ws.title,
+                        coluna=coluna,
+                        linha=num_linha,
+                        valor=str(linha[idx]),
+                    )
+
+        for coluna, valores in datas.items():
+            _conferir_datas(valores, coluna, ws.title)
+
+        return _dimensoes(ws)
+    finally:
+        wb.close()
+
+
+def validar_lancamentos(arquivo):
+    # Tipos usados por normalizar_partida_dobrada e quebrar_conta no motor
+    return validar_planilha(
+        arquivo,
+        COLUNAS_LANCAMENTOS,
+        colunas_data=["Data"],
+        tipos={
+            "Conta Débito": (_eh_texto, "de texto"),
+            "Conta Crédito": (_eh_texto, "de texto"),
+            "Valor": (_eh_numero, "numérica"),
+        },
+    )
+
+
+def validar_plano_contas(arquivo):
+    # Tipos usados por gerar_mapa_plano_contas no motor
+    return validar_planilha(
+        arquivo,
+        COLUNAS_PLANO,
+        tipos={
+            "Descrição": (_eh_texto, "de texto"),
+            "Grupo Conta": (_eh_numero, "numérica"),
+            "Analítica": (_eh_booleano, "booleana"),
+        },
+    )